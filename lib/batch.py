@@ -0,0 +1,303 @@
+"""
+Parallel batch converter for large CSV files.
+
+Each input line is "conversion_type,value", e.g. "lbs_to_kg,150".
+The file is split into newline-aligned byte ranges over an mmap, every
+range is converted in a worker process and a single writer collects the
+results into an output CSV and the conversions table.
+
+Usage:
+    python -m lib.batch input.csv -o output.csv --workers 4 --user-id 1
+"""
+
+import argparse
+import mmap
+import os
+import queue
+import sys
+import time
+from array import array
+from collections import namedtuple
+from multiprocessing import Pool
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import StaticPool
+
+from lib.db.models import Conversion, CONVERSION_TYPES
+from lib.db.schema import prepare_database
+from lib.helpers import get_conversion_result
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+INSERT_BATCH_SIZE = 10000
+IN_FLIGHT_PER_WORKER = 2
+HEADER = b"conversion_type"
+
+# What a worker sends back for one range: counts, the preformatted output
+# lines and the values to insert, one array entry per converted row.
+Chunk = namedtuple('Chunk', ['converted', 'skipped', 'output', 'type_ids', 'values', 'results'])
+
+def split_ranges(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return (start, end) byte ranges that each end on a line boundary."""
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1 byte.")
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    ranges = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = mm.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if end == -1 else end + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def iter_range(path, start, end):
+    """Yield (conv_type, value, result) for each line in [start, end).
+
+    Lines are read straight off the mmap, so memory stays flat however
+    large the range is. Lines that fail to convert yield None.
+    """
+    if end <= start:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        mm.seek(start)
+        while mm.tell() < end:
+            line = mm.readline()
+            if not line.strip() or line.startswith(HEADER):
+                continue
+            try:
+                conv_type, value = line.decode().split(',')
+                conv_type = conv_type.strip()
+                value = float(value)
+                yield conv_type, value, get_conversion_result(conv_type, value)
+            except (ValueError, UnicodeDecodeError):
+                yield None
+
+def convert_range(path, start, end):
+    """Convert every line in [start, end). Returns (rows, skipped)."""
+    rows = []
+    skipped = 0
+    for row in iter_range(path, start, end):
+        if row is None:
+            skipped += 1
+        else:
+            rows.append(row)
+    return rows, skipped
+
+def convert_chunk(path, start, end, want_output=True, want_rows=True):
+    """Convert [start, end) into a compact Chunk for the writer process.
+
+    Output lines come back as one preformatted bytes block and insert
+    values as typed arrays, which are much cheaper to pickle than a list
+    of tuples.
+    """
+    lines = []
+    type_ids = array('B')
+    values = array('d')
+    results = array('d')
+    converted = skipped = 0
+    for row in iter_range(path, start, end):
+        if row is None:
+            skipped += 1
+            continue
+        converted += 1
+        conv_type, value, result = row
+        if want_output:
+            lines.append(f"{conv_type},{value},{result}\n")
+        if want_rows:
+            type_ids.append(CONVERSION_TYPES[conv_type].id)
+            values.append(value)
+            results.append(result)
+    return Chunk(converted, skipped, "".join(lines).encode(), type_ids, values, results)
+
+def convert_ranges(path, ranges, workers=None, ordered=True, want_output=True, want_rows=True):
+    """Yield a Chunk per range, converting ranges in worker processes.
+
+    At most 2 * workers chunks are submitted but not yet yielded, so the
+    parent's memory stays bounded however large the file is.
+    """
+    if not ranges:
+        return
+
+    workers = workers or os.cpu_count()
+    window = IN_FLIGHT_PER_WORKER * workers
+    done = queue.SimpleQueue()
+    tasks = iter(enumerate(ranges))
+
+    with Pool(processes=workers) as pool:
+        def submit():
+            for index, (start, end) in tasks:
+                pool.apply_async(
+                    convert_chunk,
+                    (path, start, end, want_output, want_rows),
+                    callback=lambda chunk, index=index: done.put((index, chunk, None)),
+                    error_callback=lambda error, index=index: done.put((index, None, error))
+                )
+                return True
+            return False
+
+        pending = 0
+        while pending < window and submit():
+            pending += 1
+
+        buffered = {}
+        next_index = 0
+        while pending:
+            index, chunk, error = done.get()
+            if error is not None:
+                raise error
+
+            if ordered:
+                buffered[index] = chunk
+                ready = []
+                while next_index in buffered:
+                    ready.append(buffered.pop(next_index))
+                    next_index += 1
+            else:
+                ready = [chunk]
+
+            for chunk in ready:
+                pending -= 1
+                yield chunk
+                if submit():
+                    pending += 1
+
+def convert_file(path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, ordered=True,
+                 want_output=True, want_rows=True):
+    """Split path into ranges and return a generator of converted Chunks."""
+    ranges = split_ranges(path, chunk_size)
+    return convert_ranges(path, ranges, workers, ordered, want_output, want_rows)
+
+def save_conversions(session, chunk, user_id=None):
+    """Bulk insert a converted chunk into the conversions table."""
+    try:
+        for i in range(0, chunk.converted, INSERT_BATCH_SIZE):
+            batch = slice(i, i + INSERT_BATCH_SIZE)
+            session.execute(insert(Conversion.__table__), [
+                {
+                    'conversion_type_id': type_id,
+                    'input_value': value,
+                    'result_value': result,
+                    'user_id': user_id
+                }
+                for type_id, value, result in zip(chunk.type_ids[batch], chunk.values[batch], chunk.results[batch])
+            ])
+        session.commit()
+    except SQLAlchemyError as e:
+        session.rollback()
+        raise ValueError(f"Failed to save conversions: {str(e)}")
+
+def run_batch(path, output=None, session=None, user_id=None, workers=None,
+              chunk_size=DEFAULT_CHUNK_SIZE, ordered=True):
+    """Convert a file in parallel, writing to output and/or the database.
+
+    Returns (converted, skipped) line counts.
+    """
+    chunks = convert_file(
+        path, workers, chunk_size, ordered,
+        want_output=output is not None,
+        want_rows=session is not None
+    )
+    converted = skipped = 0
+    out = open(output, 'wb') if output else None
+    try:
+        for chunk in chunks:
+            converted += chunk.converted
+            skipped += chunk.skipped
+            if out:
+                out.write(chunk.output)
+            if session is not None:
+                save_conversions(session, chunk, user_id)
+    finally:
+        if out:
+            out.close()
+    return converted, skipped
+
+def _worker_counts(max_workers):
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+def benchmark(path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Report throughput at 1, 2, 4, ... workers against a single process.
+
+    Each worker count is timed converting only, and again with the writer
+    saving every row to a throwaway in-memory database.
+    """
+    start = time.perf_counter()
+    single_rows = sum(1 for row in iter_range(path, 0, os.path.getsize(path)) if row is not None)
+    single = max(time.perf_counter() - start, 1e-9)
+    print(f"Single process: {single_rows} rows in {single:.2f}s ({single_rows / single:,.0f} rows/s)")
+
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    prepare_database(engine)
+    print(f"{'Workers':>7}  {'Convert rows/s':>14}  {'Speedup':>7}  {'With writer rows/s':>18}")
+    with Session(engine) as session:
+        for count in _worker_counts(workers or os.cpu_count()):
+            start = time.perf_counter()
+            rows, _ = run_batch(path, workers=count, chunk_size=chunk_size, ordered=False)
+            convert = max(time.perf_counter() - start, 1e-9)
+
+            start = time.perf_counter()
+            run_batch(path, session=session, workers=count, chunk_size=chunk_size, ordered=False)
+            write = max(time.perf_counter() - start, 1e-9)
+            session.query(Conversion).delete()
+            session.commit()
+
+            print(f"{count:>7}  {rows / convert:>14,.0f}  {single / convert:>6.2f}x  {rows / write:>18,.0f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a CSV of conversion_type,value lines in parallel.")
+    parser.add_argument('input', help="input CSV file")
+    parser.add_argument('-o', '--output', help="write conversion_type,value,result lines here")
+    parser.add_argument('-w', '--workers', type=int, help="worker processes (default: CPU count)")
+    parser.add_argument('-c', '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="bytes per chunk")
+    parser.add_argument('--unordered', action='store_true', help="write chunks as soon as they finish")
+    parser.add_argument('--user-id', type=int, help="user to attach saved conversions to")
+    parser.add_argument('--no-db', action='store_true', help="don't save to the conversions table")
+    parser.add_argument('--benchmark', action='store_true', help="report throughput at 1, 2, 4, ... workers")
+    args = parser.parse_args(argv)
+
+    session = None
+    try:
+        if args.benchmark:
+            benchmark(args.input, args.workers, args.chunk_size)
+            return
+
+        if not args.no_db:
+            engine = create_engine('sqlite:///unit_converter.db')
+            prepare_database(engine)
+            session = sessionmaker(bind=engine)()
+
+        start = time.perf_counter()
+        converted, skipped = run_batch(
+            args.input,
+            output=args.output,
+            session=session,
+            user_id=args.user_id,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            ordered=not args.unordered
+        )
+        elapsed = time.perf_counter() - start
+        print(f"Converted {converted} rows in {elapsed:.2f}s ({converted / max(elapsed, 1e-9):,.0f} rows/s)")
+        if skipped:
+            print(f"Skipped {skipped} invalid lines")
+    except (OSError, ValueError) as e:
+        print(f"Batch conversion failed: {e}")
+        sys.exit(1)
+    finally:
+        if session is not None:
+            session.close()
+
+if __name__ == '__main__':
+    main()
@@ -11,13 +11,27 @@ import sys
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from lib.db.models import Base, User, Conversion
-from lib.helpers import get_conversion_result
+from lib.db.catalog import resolve_conversion_type
+from lib.db.models import User, Conversion
+from lib.db.schema import prepare_database
+from lib.helpers import get_conversion_result, parse_expression
 
 engine = create_engine('sqlite:///unit_converter.db')
-Base.metadata.create_all(engine) 
+prepare_database(engine)
 Session = sessionmaker(bind=engine) 
 
+CONVERSION_MENU = {
+    '1': "lbs_to_kg",
+    '2': "kg_to_lbs",
+    '3': "in_to_cm",
+    '4': "cm_to_in"
+}
+
+# Friendlier names for catalog units when shown to the user
+UNIT_LABELS = {
+    'in': "inches"
+}
+
 def get_valid_choice(prompt, options):
     while True:
         choice = input(prompt).strip()
@@ -159,21 +173,21 @@ def perform_conversion(session):
     print("2. Kilograms to Pounds")
     print("3. Inches to Centimeters")
     print("4. Centimeters to Inches")
+    print("5. Type an expression (e.g. 5 ft 11 in to cm)")
 
-    conversion_map = {
-        '1': ("lbs_to_kg", "lbs", "kg"),
-        '2': ("kg_to_lbs", "kg", "lbs"),
-        '3': ("in_to_cm", "inches", "cm"),
-        '4': ("cm_to_in", "cm", "inches")
-    }
-
-    conv_choice = get_valid_choice("Your choice (1-4): ", conversion_map.keys())
-    conv_type, unit_in, unit_out = conversion_map[conv_choice]
-
-    input_value = get_valid_float(f"Enter value in {unit_in}: ")
+    conv_choice = get_valid_choice("Your choice (1-5): ", ['1', '2', '3', '4', '5'])
 
     try:
-        result = get_conversion_result(conv_type, input_value)
+        if conv_choice == '5':
+            expression = input("Enter expression: ").strip()
+            conv_type, input_value, result = parse_expression(expression)
+            unit_in, unit_out = get_conversion_units(conv_type)
+        else:
+            conv_type = CONVERSION_MENU[conv_choice]
+            unit_in, unit_out = get_conversion_units(conv_type)
+            input_value = get_valid_float(f"Enter value in {unit_in}: ")
+            result = get_conversion_result(conv_type, input_value)
+
         conversion = Conversion.create(
             session,
             conversion_type=conv_type,
@@ -215,17 +229,7 @@ def view_conversion_history(session):
 
     print(f"\n{user.name}'s Conversion History:")
     for conv in user.conversions:
-        if conv.conversion_type == "lbs_to_kg":
-            units = ("lbs", "kg")
-        elif conv.conversion_type == "kg_to_lbs":
-            units = ("kg", "lbs")
-        elif conv.conversion_type == "in_to_cm":
-            units = ("inches", "cm")
-        elif conv.conversion_type == "cm_to_in":
-            units = ("cm", "inches")
-        else:
-            units = ("?", "?")
-            
+        units = get_conversion_units(conv.conversion_type_id)
         favorite_indicator = "★" if conv in user.favorite_conversions else ""
         print(f"  {conv.id}: {conv.input_value:.2f} {units[0]} → {conv.result_value:.2f} {units[1]} {favorite_indicator}")
 
@@ -264,7 +268,7 @@ def manage_favorites(session, user):
                 
             print("\nFavorite Conversions:")
             for conv in user.favorite_conversions:
-                units = get_conversion_units(conv.conversion_type)
+                units = get_conversion_units(conv.conversion_type_id)
                 print(f"  {conv.id}: {conv.input_value:.2f}{units[0]} → {conv.result_value:.2f}{units[1]}")
                 
         elif choice == '2':
@@ -275,7 +279,7 @@ def manage_favorites(session, user):
             print("\nAvailable Conversions:")
             for conv in user.conversions:
                 if conv not in user.favorite_conversions:
-                    units = get_conversion_units(conv.conversion_type)
+                    units = get_conversion_units(conv.conversion_type_id)
                     print(f"  {conv.id}: {conv.input_value:.2f}{units[0]} → {conv.result_value:.2f}{units[1]}")
             
             conv_id = get_valid_int("\nEnter conversion ID to favorite: ")
@@ -301,7 +305,7 @@ def manage_favorites(session, user):
                 
             print("\nCurrent Favorites:")
             for conv in user.favorite_conversions:
-                units = get_conversion_units(conv.conversion_type)
+                units = get_conversion_units(conv.conversion_type_id)
                 print(f"  {conv.id}: {conv.input_value:.2f}{units[0]} → {conv.result_value:.2f}{units[1]}")
             
             conv_id = get_valid_int("\nEnter conversion ID to remove from favorites: ")
@@ -320,12 +324,14 @@ def manage_favorites(session, user):
             break
 
 def get_conversion_units(conv_type):
-    return {
-        'lbs_to_kg': ('lbs', 'kg'),
-        'kg_to_lbs': ('kg', 'lbs'),
-        'in_to_cm': ('inches', 'cm'),
-        'cm_to_in': ('cm', 'inches')
-    }.get(conv_type, ('?', '?'))
+    try:
+        info = resolve_conversion_type(conv_type)
+    except ValueError:
+        return ('?', '?')
+    return (
+        UNIT_LABELS.get(info.input_unit, info.input_unit),
+        UNIT_LABELS.get(info.output_unit, info.output_unit)
+    )
 
 if __name__ == '__main__':
     print("Welcome to the Unit Converter!")
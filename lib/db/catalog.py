@@ -0,0 +1,33 @@
+"""
+Catalog of supported conversions.
+
+This is the single definition of every conversion type: the
+conversion_types table is created and kept in sync from it, and
+lib.helpers converts values with its factors. Kept free of SQLAlchemy so
+the pure conversion code can import it.
+"""
+
+from collections import namedtuple
+from types import MappingProxyType
+
+ConversionTypeInfo = namedtuple('ConversionTypeInfo', ['id', 'code', 'input_unit', 'output_unit', 'factor'])
+
+KG_PER_LB = 0.45359237
+CM_PER_IN = 2.54
+
+CONVERSION_TYPE_ROWS = (
+    ConversionTypeInfo(1, 'lbs_to_kg', 'lbs', 'kg', KG_PER_LB),
+    ConversionTypeInfo(2, 'kg_to_lbs', 'kg', 'lbs', 1 / KG_PER_LB),
+    ConversionTypeInfo(3, 'in_to_cm', 'in', 'cm', CM_PER_IN),
+    ConversionTypeInfo(4, 'cm_to_in', 'cm', 'in', 1 / CM_PER_IN),
+)
+
+CONVERSION_TYPES = MappingProxyType({row.code: row for row in CONVERSION_TYPE_ROWS})
+CONVERSION_TYPES_BY_ID = MappingProxyType({row.id: row for row in CONVERSION_TYPE_ROWS})
+
+def resolve_conversion_type(conversion_type):
+    """Look up a catalog entry by type ID or code."""
+    info = CONVERSION_TYPES_BY_ID.get(conversion_type) or CONVERSION_TYPES.get(conversion_type)
+    if info is None:
+        raise ValueError(f"Invalid conversion type. Must be one of: {list(CONVERSION_TYPES)}")
+    return info
@@ -0,0 +1,80 @@
+"""add conversion_types catalog
+
+Revision ID: 3f1c2a9b7d40
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from lib.db.catalog import CONVERSION_TYPE_ROWS
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9b7d40'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conversion_types = op.create_table(
+        'conversion_types',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('code', sa.String(length=20), nullable=False),
+        sa.Column('input_unit', sa.String(length=10), nullable=False),
+        sa.Column('output_unit', sa.String(length=10), nullable=False),
+        sa.Column('factor', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('code')
+    )
+    op.bulk_insert(conversion_types, [info._asdict() for info in CONVERSION_TYPE_ROWS])
+
+    with op.batch_alter_table('conversions') as batch_op:
+        batch_op.add_column(sa.Column('conversion_type_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_conversions_conversion_type_id', 'conversion_types', ['conversion_type_id'], ['id']
+        )
+
+    # Backfill existing string-keyed rows
+    op.execute(
+        "UPDATE conversions SET conversion_type_id = "
+        "(SELECT id FROM conversion_types WHERE conversion_types.code = conversions.conversion_type)"
+    )
+    unmatched = op.get_bind().execute(
+        sa.text("SELECT COUNT(*) FROM conversions WHERE conversion_type_id IS NULL")
+    ).scalar()
+    if unmatched:
+        raise RuntimeError(f"{unmatched} conversions have a conversion_type that is not in the catalog.")
+
+    # The type ID is now the source of truth; codes and units come from the catalog
+    with op.batch_alter_table('conversions') as batch_op:
+        batch_op.alter_column('conversion_type_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column('conversion_type')
+        batch_op.drop_column('input_unit')
+        batch_op.drop_column('output_unit')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('conversions') as batch_op:
+        batch_op.add_column(sa.Column('conversion_type', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('input_unit', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('output_unit', sa.String(length=10), nullable=True))
+
+    for column in ('conversion_type', 'input_unit', 'output_unit'):
+        source = 'code' if column == 'conversion_type' else column
+        op.execute(
+            f"UPDATE conversions SET {column} = "
+            f"(SELECT {source} FROM conversion_types WHERE conversion_types.id = conversions.conversion_type_id)"
+        )
+
+    with op.batch_alter_table('conversions') as batch_op:
+        batch_op.alter_column('conversion_type', existing_type=sa.String(length=20), nullable=False)
+        batch_op.drop_constraint('fk_conversions_conversion_type_id', type_='foreignkey')
+        batch_op.drop_column('conversion_type_id')
+    op.drop_table('conversion_types')
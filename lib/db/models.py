@@ -5,6 +5,10 @@ from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Tab
 from sqlalchemy.orm import declarative_base, relationship, validates
 from sqlalchemy.exc import SQLAlchemyError
 
+from lib.db.catalog import (
+    ConversionTypeInfo, CONVERSION_TYPE_ROWS, CONVERSION_TYPES, CONVERSION_TYPES_BY_ID, resolve_conversion_type
+)
+
 Base = declarative_base()
 
 # Association table for the many-to-many relationship
@@ -91,17 +95,54 @@ class User(Base):
             return True
         return False
 
+class ConversionType(Base):
+    __tablename__ = 'conversion_types'
+
+    id = Column(Integer, primary_key=True)
+    code = Column(String(20), nullable=False, unique=True)
+    input_unit = Column(String(10), nullable=False)
+    output_unit = Column(String(10), nullable=False)
+    factor = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"ConversionType #{self.id}: {self.code} ({self.input_unit}→{self.output_unit})"
+
+    @classmethod
+    def sync(cls, session):
+        """Bring the conversion_types table in line with the catalog.
+
+        Missing rows are inserted and rows whose code, units or factor have
+        drifted are corrected. Returns the number of rows changed.
+        """
+        try:
+            existing = {row.id: row for row in session.query(cls)}
+            changed = 0
+            for info in CONVERSION_TYPE_ROWS:
+                row = existing.get(info.id)
+                if row is None:
+                    session.add(cls(**info._asdict()))
+                    changed += 1
+                elif ConversionTypeInfo(row.id, row.code, row.input_unit, row.output_unit, row.factor) != info:
+                    row.code = info.code
+                    row.input_unit = info.input_unit
+                    row.output_unit = info.output_unit
+                    row.factor = info.factor
+                    changed += 1
+            session.commit()
+            return changed
+        except SQLAlchemyError as e:
+            session.rollback()
+            raise ValueError(f"Failed to sync conversion types: {str(e)}")
+
 class Conversion(Base):
     __tablename__ = 'conversions'
 
     id = Column(Integer, primary_key=True)
-    conversion_type = Column(String(20), nullable=False) 
+    conversion_type_id = Column(Integer, ForeignKey('conversion_types.id'), nullable=False)
     input_value = Column(Float, nullable=False)
     result_value = Column(Float, nullable=False)
     user_id = Column(Integer, ForeignKey('users.id'))
     created_at = Column(DateTime, default=datetime.utcnow) 
-    input_unit = Column(String(10)) 
-    output_unit = Column(String(10)) 
 
     user = relationship("User", back_populates="conversions")
     favorited_by = relationship(
@@ -113,30 +154,33 @@ class Conversion(Base):
     def __repr__(self):
         return f"Conversion: {self.input_value}{self.input_unit}→{self.result_value}{self.output_unit} ({self.conversion_type})"
 
-    @validates('conversion_type')
-    def validate_conversion_type(self, key, conv_type):
-        valid_types = ['lbs_to_kg', 'kg_to_lbs', 'in_to_cm', 'cm_to_in']
-        if conv_type not in valid_types:
-            raise ValueError(f"Invalid conversion type. Must be one of: {valid_types}")
-        return conv_type
+    @validates('conversion_type_id')
+    def validate_conversion_type_id(self, key, type_id):
+        if type_id not in CONVERSION_TYPES_BY_ID:
+            raise ValueError(f"Invalid conversion type ID. Must be one of: {list(CONVERSION_TYPES_BY_ID)}")
+        return type_id
+
+    # Code and units are looked up from the catalog rather than stored per row
+    @property
+    def conversion_type(self):
+        return CONVERSION_TYPES_BY_ID[self.conversion_type_id].code
+
+    @property
+    def input_unit(self):
+        return CONVERSION_TYPES_BY_ID[self.conversion_type_id].input_unit
+
+    @property
+    def output_unit(self):
+        return CONVERSION_TYPES_BY_ID[self.conversion_type_id].output_unit
 
     @classmethod
     def log_conversion(cls, session, conv_type, input_val, result_val, user_id):
         try:
-            units = {
-                'lbs_to_kg': ('lbs', 'kg'),
-                'kg_to_lbs': ('kg', 'lbs'),
-                'in_to_cm': ('in', 'cm'),
-                'cm_to_in': ('cm', 'in')
-            }.get(conv_type, ('?', '?'))
-            
             new_conv = cls(
-                conversion_type=conv_type,
+                conversion_type_id=resolve_conversion_type(conv_type).id,
                 input_value=input_val,
                 result_value=result_val,
-                user_id=user_id,
-                input_unit=units[0],
-                output_unit=units[1]
+                user_id=user_id
             )
             session.add(new_conv)
             session.commit()
@@ -0,0 +1,32 @@
+"""
+Bring a database up to the current schema before the app uses it.
+
+New databases are created from the models and stamped at the latest
+Alembic revision. Existing ones, including databases made before Alembic
+was in use, are upgraded to head. Either way the conversion_types table
+is then synced with the catalog.
+"""
+
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from lib.db.models import Base, ConversionType
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alembic.ini')
+
+def prepare_database(engine):
+    config = Config(ALEMBIC_INI)
+    with engine.begin() as connection:
+        config.attributes['connection'] = connection
+        if not inspect(connection).has_table('conversions'):
+            Base.metadata.create_all(connection)
+            command.stamp(config, 'head')
+        else:
+            command.upgrade(config, 'head')
+
+    with Session(engine) as session:
+        ConversionType.sync(session)
@@ -4,13 +4,14 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 
 from lib.db.models import Base, User, Conversion
+from lib.db.schema import prepare_database
 
 def initialize_database():
     engine = create_engine('sqlite:///unit_converter.db')
     
 
     Base.metadata.drop_all(engine)
-    Base.metadata.create_all(engine)
+    prepare_database(engine)
     
     Session = sessionmaker(bind=engine)
     session = Session()
@@ -1,11 +1,12 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from lib.db.models import Base, User, Conversion
+from lib.db.models import User, Conversion
+from lib.db.schema import prepare_database
 
 def debug_session():
     engine = create_engine('sqlite:///unit_converter.db')
-    Base.metadata.create_all(engine)
+    prepare_database(engine)
     Session = sessionmaker(bind=engine)
     session = Session()
 
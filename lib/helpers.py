@@ -1,35 +1,176 @@
-def lbs_to_kg(pounds):
+import re
+from functools import lru_cache
+
+from lib.db.catalog import CONVERSION_TYPES, CM_PER_IN, KG_PER_LB, resolve_conversion_type
+
+def convert(info, value):
     try:
-        return round(pounds * 0.45359237, 2)
+        return round(value * info.factor, 2)
     except TypeError:
         raise ValueError("Input must be a number.")
 
+def lbs_to_kg(pounds):
+    return convert(CONVERSION_TYPES['lbs_to_kg'], pounds)
+
 def kg_to_lbs(kilograms):
-    try:
-        return round(kilograms / 0.45359237, 2)
-    except TypeError:
-        raise ValueError("Input must be a number.")
+    return convert(CONVERSION_TYPES['kg_to_lbs'], kilograms)
 
 def inches_to_cm(inches):
-    try:
-        return round(inches * 2.54, 2)
-    except TypeError:
-        raise ValueError("Input must be a number.")
+    return convert(CONVERSION_TYPES['in_to_cm'], inches)
 
 def cm_to_inches(cm):
-    try:
-        return round(cm / 2.54, 2)
-    except TypeError:
-        raise ValueError("Input must be a number.")
+    return convert(CONVERSION_TYPES['cm_to_in'], cm)
 
 def get_conversion_result(conversion_type, value):
-    if conversion_type == "lbs_to_kg":
-        return lbs_to_kg(value)
-    elif conversion_type == "kg_to_lbs":
-        return kg_to_lbs(value)
-    elif conversion_type == "in_to_cm":
-        return inches_to_cm(value)
-    elif conversion_type == "cm_to_in":
-        return cm_to_inches(value)
+    """Convert value using a catalog type, given by type ID or code."""
+    return convert(resolve_conversion_type(conversion_type), value)
+
+# Free-text expressions such as "5 ft 11 in to cm" or "12 st 4 lb".
+# Every unit maps to (canonical unit, dimension, factor into the base unit),
+# where the base is lbs for weight and inches for length.
+UNITS = {
+    'lb': ('lbs', 'weight', 1.0),
+    'lbs': ('lbs', 'weight', 1.0),
+    'pound': ('lbs', 'weight', 1.0),
+    'pounds': ('lbs', 'weight', 1.0),
+    'kg': ('kg', 'weight', 1 / KG_PER_LB),
+    'kgs': ('kg', 'weight', 1 / KG_PER_LB),
+    'kilogram': ('kg', 'weight', 1 / KG_PER_LB),
+    'kilograms': ('kg', 'weight', 1 / KG_PER_LB),
+    'g': ('g', 'weight', 0.001 / KG_PER_LB),
+    'gram': ('g', 'weight', 0.001 / KG_PER_LB),
+    'grams': ('g', 'weight', 0.001 / KG_PER_LB),
+    'st': ('st', 'weight', 14.0),
+    'stone': ('st', 'weight', 14.0),
+    'stones': ('st', 'weight', 14.0),
+    'oz': ('oz', 'weight', 1 / 16),
+    'ounce': ('oz', 'weight', 1 / 16),
+    'ounces': ('oz', 'weight', 1 / 16),
+    'in': ('in', 'length', 1.0),
+    'inch': ('in', 'length', 1.0),
+    'inches': ('in', 'length', 1.0),
+    '"': ('in', 'length', 1.0),
+    'ft': ('ft', 'length', 12.0),
+    'foot': ('ft', 'length', 12.0),
+    'feet': ('ft', 'length', 12.0),
+    "'": ('ft', 'length', 12.0),
+    'cm': ('cm', 'length', 1 / CM_PER_IN),
+    'm': ('m', 'length', 100 / CM_PER_IN),
+    'metre': ('m', 'length', 100 / CM_PER_IN),
+    'metres': ('m', 'length', 100 / CM_PER_IN),
+    'meter': ('m', 'length', 100 / CM_PER_IN),
+    'meters': ('m', 'length', 100 / CM_PER_IN),
+    'mm': ('mm', 'length', 0.1 / CM_PER_IN),
+}
+
+# Target unit -> (conversion type, source unit of that conversion)
+EXPRESSION_TARGETS = {
+    'kg': ('lbs_to_kg', 'lbs'),
+    'lbs': ('kg_to_lbs', 'kg'),
+    'cm': ('in_to_cm', 'in'),
+    'in': ('cm_to_in', 'cm'),
+}
+
+# Target used when an expression doesn't name one: the counterpart unit in
+# the other measurement system, chosen by the first unit in the expression.
+DEFAULT_TARGETS = {
+    'lbs': 'kg',
+    'st': 'kg',
+    'oz': 'kg',
+    'kg': 'lbs',
+    'g': 'lbs',
+    'in': 'cm',
+    'ft': 'cm',
+    'cm': 'in',
+    'm': 'in',
+    'mm': 'in',
+}
+
+TARGET_KEYWORDS = ('to', 'into', '->')
+
+_NUMBER = re.compile(r'(\d+(?:\.\d*)?|\.\d+)')
+_WORD = re.compile(r"[a-z]+|->|'|\"")
+
+def _lookup_unit(token):
+    try:
+        return UNITS[token]
+    except KeyError:
+        raise ValueError(f"Unknown unit: {token}")
+
+@lru_cache(maxsize=256)
+def _compile_plan(shape, target_unit):
+    # shape holds the text around the numbers, e.g. ('', 'ft', 'in to cm').
+    if shape[0]:
+        raise ValueError("Expression must start with a number.")
+
+    units = []
+    for segment in shape[1:-1]:
+        tokens = _WORD.findall(segment)
+        if len(tokens) != 1:
+            raise ValueError("Each number must be followed by exactly one unit.")
+        units.append(_lookup_unit(tokens[0]))
+
+    tokens = _WORD.findall(shape[-1])
+    if not tokens:
+        raise ValueError("Each number must be followed by exactly one unit.")
+    units.append(_lookup_unit(tokens[0]))
+    if len(tokens) > 1:
+        if len(tokens) != 3 or tokens[1] not in TARGET_KEYWORDS:
+            raise ValueError("Expected '<quantity> to <unit>'.")
+        target_unit = tokens[2]
+
+    if target_unit is None:
+        target = DEFAULT_TARGETS[units[0][0]]
     else:
-        raise ValueError("Unsupported conversion type.")
+        target = _lookup_unit(target_unit)[0]
+    if target not in EXPRESSION_TARGETS:
+        raise ValueError(f"Cannot convert to {target}. Must be one of: {list(EXPRESSION_TARGETS)}")
+    if all(unit == target for unit, _, _ in units):
+        raise ValueError(f"Nothing to convert: already in {target}.")
+    conv_type, source = EXPRESSION_TARGETS[target]
+    _, dimension, source_factor = UNITS[source]
+
+    factors = []
+    for _, unit_dimension, factor in units:
+        if unit_dimension != dimension:
+            raise ValueError(f"Cannot mix {unit_dimension} and {dimension} units.")
+        factors.append(factor / source_factor)
+    return conv_type, tuple(factors)
+
+def parse_expression(expression, target_unit=None):
+    """Convert a compound quantity such as "5 ft 11 in to cm".
+
+    A "to <unit>" in the text wins over target_unit. With neither, the
+    counterpart unit in the other system is used ("12 st 4 lb" -> kg).
+    Returns (conversion_type, input_value, result) where input_value is the
+    whole quantity expressed in the source unit of conversion_type.
+    """
+    if not isinstance(expression, str):
+        raise ValueError("Expression must be a string.")
+    parts = _NUMBER.split(expression.strip().lower())
+    if len(parts) < 3:
+        raise ValueError("Expression must contain a number.")
+    if target_unit is not None:
+        target_unit = target_unit.strip().lower()
+
+    shape = tuple(part.strip() for part in parts[0::2])
+    conv_type, factors = _compile_plan(shape, target_unit)
+
+    input_value = sum(float(n) * f for n, f in zip(parts[1::2], factors))
+    result = get_conversion_result(conv_type, input_value)
+    return conv_type, round(input_value, 2), result
+
+def convert_expressions(expressions, target_unit=None):
+    """Convert many expressions, skipping any that fail to parse.
+
+    Returns (rows, skipped) where rows holds a parse_expression() tuple for
+    every expression that converted and skipped counts the rest.
+    """
+    rows = []
+    skipped = 0
+    for expression in expressions:
+        try:
+            rows.append(parse_expression(expression, target_unit))
+        except ValueError:
+            skipped += 1
+    return rows, skipped
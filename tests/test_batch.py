@@ -0,0 +1,114 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from lib.batch import convert_chunk, convert_range, main, run_batch, split_ranges
+from lib.db.models import Conversion
+from lib.db.schema import prepare_database
+
+def write(tmp_path, content, name='input.csv'):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+@pytest.fixture
+def large_csv(tmp_path):
+    types = ['lbs_to_kg', 'kg_to_lbs', 'in_to_cm', 'cm_to_in']
+    lines = [b"conversion_type,value\n"]
+    lines += [f"{types[i % 4]},{i * 0.37:.2f}\n".encode() for i in range(5000)]
+    return write(tmp_path, b"".join(lines))
+
+def test_split_ranges_are_contiguous_and_line_aligned(large_csv):
+    ranges = split_ranges(large_csv, chunk_size=1000)
+    size = os.path.getsize(large_csv)
+    with open(large_csv, 'rb') as f:
+        data = f.read()
+
+    assert len(ranges) > 1
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == size
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert data[end - 1:end] == b"\n"
+
+def test_split_ranges_empty_file_and_bad_chunk_size(tmp_path):
+    path = write(tmp_path, b"")
+    assert split_ranges(path) == []
+    with pytest.raises(ValueError):
+        split_ranges(path, chunk_size=0)
+
+def test_convert_range_handles_crlf_and_missing_final_newline(tmp_path):
+    path = write(tmp_path, b"lbs_to_kg,150\r\nin_to_cm,70\r\nkg_to_lbs,90")
+    rows, skipped = convert_range(path, 0, os.path.getsize(path))
+    assert rows == [('lbs_to_kg', 150.0, 68.04), ('in_to_cm', 70.0, 177.8), ('kg_to_lbs', 90.0, 198.42)]
+    assert skipped == 0
+
+def test_convert_range_counts_bad_lines(tmp_path):
+    path = write(tmp_path, b"conversion_type,value\nbogus,1\nlbs_to_kg,abc\nlbs_to_kg\n\nlbs_to_kg,1\n")
+    rows, skipped = convert_range(path, 0, os.path.getsize(path))
+    assert rows == [('lbs_to_kg', 1.0, 0.45)]
+    assert skipped == 3
+
+def test_convert_range_empty_file(tmp_path):
+    path = write(tmp_path, b"")
+    assert convert_range(path, 0, 0) == ([], 0)
+
+def test_ordered_run_batch_matches_single_process(large_csv, tmp_path):
+    output = str(tmp_path / 'output.csv')
+    converted, skipped = run_batch(large_csv, output=output, workers=2, chunk_size=1000)
+
+    rows, _ = convert_range(large_csv, 0, os.path.getsize(large_csv))
+    expected = "".join(f"{conv_type},{value},{result}\n" for conv_type, value, result in rows)
+    with open(output) as f:
+        assert f.read() == expected
+    assert (converted, skipped) == (5000, 0)
+
+def test_unordered_run_batch_has_the_same_lines(large_csv, tmp_path):
+    ordered = str(tmp_path / 'ordered.csv')
+    unordered = str(tmp_path / 'unordered.csv')
+    run_batch(large_csv, output=ordered, workers=2, chunk_size=1000)
+    run_batch(large_csv, output=unordered, workers=2, chunk_size=1000, ordered=False)
+    with open(ordered) as a, open(unordered) as b:
+        assert sorted(a) == sorted(b)
+
+def test_convert_chunk_returns_compact_rows(tmp_path):
+    path = write(tmp_path, b"lbs_to_kg,150\nbogus,1\ncm_to_in,2.54\n")
+    chunk = convert_chunk(path, 0, os.path.getsize(path))
+    assert (chunk.converted, chunk.skipped) == (2, 1)
+    assert chunk.output == b"lbs_to_kg,150.0,68.04\ncm_to_in,2.54,1.0\n"
+    assert list(chunk.type_ids) == [1, 4]
+    assert list(chunk.values) == [150.0, 2.54]
+    assert list(chunk.results) == [68.04, 1.0]
+
+def test_missing_input_leaves_output_untouched(tmp_path):
+    output = write(tmp_path, b"keep me\n", name='output.csv')
+    with pytest.raises(OSError):
+        run_batch(str(tmp_path / 'missing.csv'), output=output)
+    with open(output, 'rb') as f:
+        assert f.read() == b"keep me\n"
+
+def test_run_batch_saves_conversions(large_csv):
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    prepare_database(engine)
+    with Session(engine) as session:
+        converted, _ = run_batch(large_csv, session=session, user_id=None, workers=2, chunk_size=1000)
+        assert session.query(Conversion).count() == converted == 5000
+        first = session.query(Conversion).order_by(Conversion.id).first()
+        assert (first.conversion_type, first.input_value, first.result_value) == ('lbs_to_kg', 0.0, 0.0)
+
+def test_benchmark_reports_each_worker_count(large_csv, capsys):
+    main([large_csv, '--benchmark', '--workers', '2', '--chunk-size', '10000'])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("Single process: 5000 rows")
+    assert [line.split()[0] for line in lines[2:]] == ['1', '2']
+
+def test_benchmark_reports_errors_cleanly(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / 'missing.csv'), '--benchmark'])
+    assert "Batch conversion failed" in capsys.readouterr().out
+
+    main([write(tmp_path, b""), '--benchmark', '--workers', '1'])
+    assert "Single process: 0 rows" in capsys.readouterr().out
@@ -0,0 +1,60 @@
+import pytest
+
+from lib.helpers import (
+    _compile_plan, convert_expressions, get_conversion_result, parse_expression
+)
+
+def test_get_conversion_result_by_code_and_id():
+    assert get_conversion_result('lbs_to_kg', 150) == 68.04
+    assert get_conversion_result(1, 150) == 68.04
+    assert get_conversion_result('cm_to_in', 2.54) == 1.0
+    with pytest.raises(ValueError):
+        get_conversion_result('bogus', 1)
+    with pytest.raises(ValueError):
+        get_conversion_result('lbs_to_kg', 'abc')
+
+@pytest.mark.parametrize('expression, expected', [
+    ("5 ft 11 in to cm", ('in_to_cm', 71.0, 180.34)),
+    ("12 st 4 lb to kg", ('lbs_to_kg', 172.0, 78.02)),
+    ("70kg to lbs", ('kg_to_lbs', 70.0, 154.32)),
+    ("5'11\" to cm", ('in_to_cm', 71.0, 180.34)),
+    ("70 kg -> lbs", ('kg_to_lbs', 70.0, 154.32)),
+    ("1.8 m into in", ('cm_to_in', 180.0, 70.87)),
+])
+def test_parse_expression(expression, expected):
+    assert parse_expression(expression) == expected
+
+def test_default_target_is_counterpart_unit():
+    assert parse_expression("12 st 4 lb") == ('lbs_to_kg', 172.0, 78.02)
+    assert parse_expression("180 cm") == ('cm_to_in', 180.0, 70.87)
+
+def test_target_in_text_wins_over_argument():
+    assert parse_expression("70 kg to lbs", target_unit='kg') == ('kg_to_lbs', 70.0, 154.32)
+    assert parse_expression("5 ft 11 in", target_unit='cm') == ('in_to_cm', 71.0, 180.34)
+
+@pytest.mark.parametrize('expression', [
+    "-5 kg",
+    "1,000 kg",
+    "5 kg to kg",
+    "5 kg 3 in to cm",
+    "5 parsecs to cm",
+    "5 kg to st",
+    "5 kg lbs",
+    "kg",
+])
+def test_parse_expression_rejects(expression):
+    with pytest.raises(ValueError):
+        parse_expression(expression)
+
+def test_plans_are_cached_by_shape():
+    _compile_plan.cache_clear()
+    parse_expression("5 ft 11 in to cm")
+    parse_expression("6 ft 2 in to cm")
+    info = _compile_plan.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+def test_convert_expressions_skips_bad_lines():
+    rows, skipped = convert_expressions(["5 kg to lbs", "bad", "6 ft"])
+    assert rows == [('kg_to_lbs', 5.0, 11.02), ('in_to_cm', 72.0, 182.88)]
+    assert skipped == 1